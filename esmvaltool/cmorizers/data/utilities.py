@@ -6,6 +6,7 @@ import os
 import re
 import shutil
 import warnings
+import zlib
 from contextlib import contextmanager
 from pathlib import Path
 
@@ -25,6 +26,10 @@ logger = logging.getLogger(__name__)
 
 REFERENCES_PATH = Path(esmvaltool_file).absolute().parent / 'references'
 
+# Archives that expand to at most this size (in bytes) are decompressed in
+# memory in one go
+GUNZIP_IN_MEMORY_LIMIT = 64 * 1024**2
+
 
 def add_height2m(cube):
     """Add scalar coordinate 'height' with value of 2m.
@@ -565,13 +570,46 @@ def unpack_files_in_folder(folder):
             decompress = True
 
 
+def _gunzip_in_memory(file_name):
+    """Decompress a gzip archive in memory.
+
+    Return the decompressed data, or None if the archive is larger than
+    GUNZIP_IN_MEMORY_LIMIT or expands to more than that. All members of a
+    multi-member archive are decompressed.
+    """
+    if os.path.getsize(file_name) > GUNZIP_IN_MEMORY_LIMIT:
+        return None
+    data = Path(file_name).read_bytes()
+    members = []
+    size = 0
+    while data:
+        decompressor = zlib.decompressobj(wbits=31)
+        try:
+            member = decompressor.decompress(
+                data, GUNZIP_IN_MEMORY_LIMIT + 1 - size)
+        except zlib.error:
+            return None
+        size += len(member)
+        if size > GUNZIP_IN_MEMORY_LIMIT or not decompressor.eof:
+            return None
+        members.append(member)
+        data = decompressor.unused_data
+    return b''.join(members)
+
+
 def _gunzip(file_name, work_dir):
     filename = os.path.split(file_name)[-1]
     filename = re.sub(r"\.gz$", "", filename, flags=re.IGNORECASE)
+    new_path = os.path.join(work_dir, filename)
+
+    data = _gunzip_in_memory(file_name)
+    if data is not None:
+        Path(new_path).write_bytes(data)
+        return
 
     with gzip.open(file_name, 'rb') as f_in:
-        with open(os.path.join(work_dir, filename), 'wb') as f_out:
-            shutil.copyfileobj(f_in, f_out)
+        with open(new_path, 'wb') as f_out:
+            shutil.copyfileobj(f_in, f_out, length=1024**2)
 
 
 try:
@@ -10,6 +10,13 @@ import numpy as np
 import iris
 
 
+def _constant(value, long_name, units):
+    """Return a scalar constant as coordinate."""
+    return iris.coords.AuxCoord(np.float32(value),
+                                long_name=long_name,
+                                units=units)
+
+
 def tetens_derivative(tas):
     """Compute the derivative of Teten's formula for saturated vapor pressure.
 
@@ -23,17 +30,32 @@ def tetens_derivative(tas):
     tas.convert_units('degC')
 
     # Saturated vapour pressure at 273 Kelvin
-    e0_const = iris.coords.AuxCoord(np.float32(6.112),
-                                    long_name='Saturated vapour pressure',
-                                    units='hPa')
+    e0_const = _constant(6.112, 'Saturated vapour pressure', 'hPa')
     emp_a = np.float32(17.67)  # empirical constant a
 
     # Empirical constant b in Tetens formula
-    emp_b = iris.coords.AuxCoord(np.float32(243.5),
-                                 long_name='Empirical constant b',
-                                 units='degC')
-    exponent = iris.analysis.maths.exp(emp_a * tas / (tas + emp_b))
-    return (exponent * e0_const / (tas + emp_b)**2) * (emp_a * emp_b)
+    emp_b = _constant(243.5, 'Empirical constant b', 'degC')
+
+    delta_svp = tas.copy(data=_tetens_derivative_data(
+        tas.core_data(), e0_const.points[0], emp_a, emp_b.points[0]))
+    delta_svp.units = e0_const.units / emp_b.units
+    return delta_svp
+
+
+def _tetens_derivative_data(temp, e0_const, emp_a, emp_b):
+    """Evaluate the derivative of Teten's formula on an array in degC."""
+    if isinstance(temp, np.ndarray) and not np.ma.isMaskedArray(temp):
+        # Realized data: compute in place to avoid temporary arrays
+        denom = temp + emp_b
+        result = emp_a * temp
+        result /= denom
+        np.exp(result, out=result)
+        denom **= 2
+        result /= denom
+        result *= emp_a * emp_b * e0_const
+        return result
+    return (emp_a * emp_b * e0_const *
+            np.exp(emp_a * temp / (temp + emp_b)) / (temp + emp_b)**2)
 
 
 def get_constants(psl):
@@ -49,35 +71,23 @@ def get_constants(psl):
 
     # Definition of constants
     # source='Wallace and Hobbs (2006), 2.6 equation 3.14',
-    rv_const = iris.coords.AuxCoord(np.float32(461.51),
-                                    long_name='Gas constant water vapour',
-                                    units='J K-1 kg-1')
+    rv_const = _constant(461.51, 'Gas constant water vapour', 'J K-1 kg-1')
     # source='Wallace and Hobbs (2006), 2.6 equation 3.14',
-    rd_const = iris.coords.AuxCoord(np.float32(287.0),
-                                    long_name='Gas constant dry air',
-                                    units='J K-1 kg-1')
+    rd_const = _constant(287.0, 'Gas constant dry air', 'J K-1 kg-1')
 
     # Latent heat of vaporization in J kg-1 (or J m-2 day-1)
     # source='Wallace and Hobbs 2006'
-    lambda_ = iris.coords.AuxCoord(np.float32(2.5e6),
-                                   long_name='Latent heat of vaporization',
-                                   units='J kg-1')
+    lambda_ = _constant(2.5e6, 'Latent heat of vaporization', 'J kg-1')
 
     # Specific heat of dry air constant pressure
     # source='Wallace and Hobbs 2006',
-    cp_const = iris.coords.AuxCoord(np.float32(1004),
-                                    long_name='Specific heat of dry air',
-                                    units='J K-1 kg-1')
+    cp_const = _constant(1004, 'Specific heat of dry air', 'J K-1 kg-1')
 
     # source='De Bruin (2016), section 4a',
-    beta = iris.coords.AuxCoord(np.float32(20),
-                                long_name='Correction Constant',
-                                units='W m-2')
+    beta = _constant(20, 'Correction Constant', 'W m-2')
 
     # source = 'De Bruin (2016), section 4a',
-    cs_const = iris.coords.AuxCoord(np.float32(110),
-                                    long_name='Empirical constant',
-                                    units='W m-2')
+    cs_const = _constant(110, 'Empirical constant', 'W m-2')
 
     # source = De Bruin (10.1175/JHM-D-15-0006.1), page 1376
     # gamma = (rv/rd) * (cp*msl/lambda_)
@@ -87,26 +97,56 @@ def get_constants(psl):
     return gamma, cs_const, beta, lambda_
 
 
+def _check_grid(cube, reference):
+    """Check that `cube` is defined on the same grid as `reference`."""
+    if cube.shape != reference.shape:
+        raise ValueError(
+            f"Cube '{cube.name()}' has shape {cube.shape}, expected "
+            f"{reference.shape} as for cube '{reference.name()}'")
+    for ref_coord in reference.dim_coords:
+        coords = cube.coords(ref_coord.name(), dim_coords=True)
+        if (not coords or cube.coord_dims(coords[0]) !=
+                reference.coord_dims(ref_coord)
+                or coords[0].units != ref_coord.units
+                or not np.array_equal(coords[0].points, ref_coord.points)):
+            raise ValueError(
+                f"Coordinate '{ref_coord.name()}' has different points for "
+                f"cubes '{cube.name()}' and '{reference.name()}'")
+
+
 def debruin_pet(psl, rsds, rsdt, tas):
     """Compute De Bruin (2016) reference evaporation.
 
     Implement equation 6 from De Bruin (10.1175/JHM-D-15-0006.1)
+
+    The equation is evaluated directly on the (possibly lazy) data arrays
+    instead of through a chain of intermediate cubes, so all input cubes
+    need to be defined on the same grid.
     """
+    for cube in (psl, rsds, rsdt):
+        _check_grid(cube, tas)
+
     # Variable derivation
-    delta_svp = tetens_derivative(tas)
+    delta_svp = tetens_derivative(tas).core_data()
     gamma, cs_const, beta, lambda_ = get_constants(psl)
+    gamma = gamma.core_data()
 
     # the definition of the radiation components according to the paper:
-    kdown = rsds
-    kdown_ext = rsdt
+    kdown = rsds.core_data()
+    kdown_ext = rsdt.core_data()
     # Equation 5
     rad_factor = np.float32(1 - 0.23)
-    net_radiation = (rad_factor * kdown) - (kdown * cs_const / kdown_ext)
+    net_radiation = (rad_factor * kdown) - (kdown * cs_const.points[0] /
+                                            kdown_ext)
     # Equation 6
     # the unit is W m-2
-    ref_evap = ((delta_svp / (delta_svp + gamma)) * net_radiation) + beta
+    ref_evap = ((delta_svp /
+                 (delta_svp + gamma)) * net_radiation) + beta.points[0]
 
-    pet = ref_evap / lambda_
+    pet = tas.copy(data=ref_evap / lambda_.points[0])
+    pet.cell_methods = ()
+    pet.attributes = {}
+    pet.units = beta.units / lambda_.units
     pet.var_name = 'evspsblpot'
     pet.standard_name = 'water_potential_evaporation_flux'
     pet.long_name = 'Potential Evapotranspiration'
@@ -14,6 +14,9 @@ from esmvaltool.diag_scripts.shared import (ProvenanceLogger,
 
 logger = logging.getLogger(Path(__file__).name)
 
+# Input cubes smaller than this (in bytes) are realized when loaded
+REALIZE_MAX_BYTES = 2 * 1024**3
+
 
 def create_provenance_record():
     """Create a provenance record."""
@@ -39,8 +42,13 @@ def create_provenance_record():
     return record
 
 
-def get_input_cubes(metadata):
-    """Create a dict with all (preprocessed) input files."""
+def get_input_cubes(metadata, realize_on_load=True):
+    """Create a dict with all (preprocessed) input files.
+
+    If `realize_on_load` is set, the data of cubes smaller than
+    REALIZE_MAX_BYTES is loaded into memory straight away, so the
+    subsequent regridding and arithmetic operate on numpy arrays.
+    """
     provenance = create_provenance_record()
     all_vars = {}
     for attributes in metadata:
@@ -51,6 +59,8 @@ def get_input_cubes(metadata):
         filename = attributes['filename']
         logger.info("Loading variable %s", short_name)
         cube = iris.load_cube(filename)
+        if realize_on_load and cube.core_data().nbytes < REALIZE_MAX_BYTES:
+            cube.data  # pylint: disable=pointless-statement
         cube.attributes.clear()
         all_vars[short_name] = cube
         provenance['ancestors'].append(filename)
@@ -202,7 +212,8 @@ def main(cfg):
     input_metadata = cfg['input_data'].values()
 
     for dataset, metadata in group_metadata(input_metadata, 'dataset').items():
-        all_vars, provenance = get_input_cubes(metadata)
+        all_vars, provenance = get_input_cubes(
+            metadata, realize_on_load=cfg.get('realize_on_load', True))
 
         if dataset == 'ERA5':
             shift_era5_time_coordinate(all_vars['tas'])
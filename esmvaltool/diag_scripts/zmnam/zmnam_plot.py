@@ -6,6 +6,8 @@ Copernicus C3S 34a lot 2 (MAGIC)
 
 """
 
+import os
+
 import cartopy.crs as ccrs
 import matplotlib as mpl
 import matplotlib.pyplot as plt
@@ -23,26 +25,28 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
     if hemisphere == 'SH':
         index_name = 'SAM'
 
+    # Common prefix of input and output file names
+    prefix = '_'.join(src_props)
+    data_prefix = os.path.join(datafolder, prefix)
+    fig_prefix = os.path.join(figfolder, prefix)
+
     plot_files = []
     # Open daily and monthly PCs
-    file_name = '_'.join(src_props) + '_pc_da_' + index_name + '.nc'
-    # print(datafolder + file_name)
-    with netCDF4.Dataset(datafolder + file_name, "r") as in_file:
+    file_name = f'{data_prefix}_pc_da_{index_name}.nc'
+    with netCDF4.Dataset(file_name, "r") as in_file:
         lev = np.array(in_file.variables['plev'][:], dtype='d')
-        pc_da = np.array(in_file.variables['PC_da'][:], dtype='d')
+        pc_da = np.array(in_file.variables['PC_da'][:], dtype='f')
 
-    file_name = '_'.join(src_props) + '_pc_mo_' + index_name + '.nc'
-    # print(datafolder + file_name)
-    with netCDF4.Dataset(datafolder + file_name, "r") as in_file:
+    file_name = f'{data_prefix}_pc_mo_{index_name}.nc'
+    with netCDF4.Dataset(file_name, "r") as in_file:
         time_mo = np.array(in_file.variables['time'][:], dtype='d')
         time_mo_uni = in_file.variables['time'].units
         time_mo_cal = in_file.variables['time'].calendar
 
-        pc_mo = np.array(in_file.variables['PC_mo'][:], dtype='d')
+        pc_mo = np.array(in_file.variables['PC_mo'][:], dtype='f')
 
     # Open monthly gh field
     file_name = file_gh_mo
-    # print(datafolder + file_name)
     with netCDF4.Dataset(file_name, "r") as in_file:
         dims = list(in_file.dimensions.keys())[::-1]  # py3
         print('mo full dims', dims)
@@ -59,7 +63,9 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
         lat = np.array(in_file.variables[latn][:])
         lon = np.array(in_file.variables[lonn][:])
 
-        zg_mo = np.array(in_file.variables['zg'][:])
+        # Read plain arrays, masks are discarded by np.array anyway
+        in_file.set_auto_mask(False)
+        zg_mo = np.array(in_file.variables['zg'][:], dtype='f')
 
         # Record attributes for output netCDFs
         time_lnam = getattr(in_file.variables['time'], 'long_name', '')
@@ -79,21 +85,37 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
         lon_axi = in_file.variables[lonn].axis
 
     # Save dates for timeseries
-    date_list = []
-    for i_date in np.arange(len(time_mo)):
-        yydate = netCDF4.num2date(time_mo, time_mo_uni,
-                                  time_mo_cal)[i_date].year
-        mmdate = netCDF4.num2date(time_mo, time_mo_uni,
-                                  time_mo_cal)[i_date].month
-        date_list.append(str(yydate) + '-' + str(mmdate))
+    dates = netCDF4.num2date(time_mo, time_mo_uni, time_mo_cal)
+    date_list = [str(date.year) + '-' + str(date.month) for date in dates]
+
+    # Regression of 3D zg field onto monthly PC, for all levels at once
+    # Following BT09, the maps are Z_m^l*PC_m^l/|PC_m^l|^2
+    norm = np.einsum('ti,ti->i', pc_mo, pc_mo)
+    regr_arr = np.einsum('tijk,ti->ijk', zg_mo, pc_mo) / norm[:, None, None]
 
-    # Prepare array for outputting regression maps (lev/lat/lon)
-    regr_arr = np.zeros((len(lev), len(lat), len(lon)), dtype='f')
+    # Create the projections, selecting hemisphere based on latitudes
+    if min(lat) > 0.:  # NH
+        ortho = ccrs.Orthographic(central_longitude=0,
+                                  central_latitude=90)
+    if min(lat) < 0.:  # SH
+        ortho = ccrs.Orthographic(central_longitude=0,
+                                  central_latitude=-90)
+
+    # Longitudes with wrap-around point, the same for all levels
+    _, lonw = add_cyclic_point(np.zeros(len(lon)), lon)
+
+    # Fixed contour levels for the regression maps, every 20 m
+    regr_levs = np.arange(-1000, 1001, 20)
+
+    # Create the figures once and reuse them for all levels
+    fig_ts = plt.figure()
+    fig_pdf = plt.figure()
+    fig_reg = plt.figure()
 
     for i_lev in np.arange(len(lev)):
 
         # Plot monthly PCs
-        plt.figure()
+        plt.figure(fig_ts.number).clear()
         plt.plot(time_mo, pc_mo[:, i_lev])
 
         # Make only a few ticks
@@ -104,16 +126,13 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
         plt.xlabel('Time')
         plt.ylabel('Zonal mean ' + index_name)
 
-        fname = (figfolder + '_'.join(src_props) + '_' +
-                 str(int(lev[i_lev])) + 'Pa_mo_ts_' + index_name +
-                 '.' + fig_fmt)
+        fname = (f'{fig_prefix}_{int(lev[i_lev])}Pa_mo_ts_{index_name}'
+                 f'.{fig_fmt}')
         plt.savefig(fname, format=fig_fmt)
         plot_files.append(fname)
 
-        plt.figure()
-
         # PDF of the daily PC
-        plt.figure()
+        plt.figure(fig_pdf.number).clear()
         min_var = -5
         max_var = 5
         n_bars = 50
@@ -139,49 +158,21 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
         plt.ylabel('Normalized probability')
         plt.tight_layout()
 
-        fname = (figfolder + '_'.join(src_props) + '_' +
-                 str(int(lev[i_lev])) + 'Pa_da_pdf_' + index_name +
-                 '.' + fig_fmt)
+        fname = (f'{fig_prefix}_{int(lev[i_lev])}Pa_da_pdf_{index_name}'
+                 f'.{fig_fmt}')
         plt.savefig(fname, format=fig_fmt)
         plot_files.append(fname)
 
-        plt.close('all')
-
-        # Regression of 3D zg field onto monthly PC
-        slope = np.zeros((len(lat), len(lon)), dtype='d')
-
-        for j_lat in np.arange(len(lat)):
-
-            for k_lon in np.arange(len(lon)):
-
-                # Following BT09, the maps are Z_m^l*PC_m^l/|PC_m^l|^2
-                slope[j_lat,
-                      k_lon] = np.dot(zg_mo[:, i_lev, j_lat,
-                                            k_lon], (pc_mo[:, i_lev]) /
-                                      np.dot(pc_mo[:, i_lev], pc_mo[:, i_lev]))
+        slope = regr_arr[i_lev]
 
         # Plots of regression maps
-        plt.figure()
-
-        # Fixed contour levels. May be improved somehow.
-        regr_levs = -1000 + np.arange(201) * 10
-
-        # Create the projections, selecting hemisphere based on latitudes
-        if min(lat) > 0.:  # NH
-            ortho = ccrs.Orthographic(central_longitude=0,
-                                      central_latitude=90)
-        if min(lat) < 0.:  # SH
-            ortho = ccrs.Orthographic(central_longitude=0,
-                                      central_latitude=-90)
-        ccrs.Geodetic()
+        plt.figure(fig_reg.number).clear()
 
         # Create the geoaxes for an orthographic projection
         axis = plt.axes(projection=ortho)
 
         # Add wrap-around point in longitude.
-        slopew, lonw = add_cyclic_point(slope, lon)
-
-        # lons, lats = np.meshgrid(lonw, lat)
+        slopew = add_cyclic_point(slope)
 
         plt.contourf(lonw,
                      lat,
@@ -192,37 +183,23 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
 
         # Switch temporarily to solid negative lines
         mpl.rcParams['contour.negative_linestyle'] = 'solid'
-        plt.contour(lonw,
-                    lat,
-                    slopew,
-                    levels=regr_levs,
-                    colors='k',
-                    transform=ccrs.PlateCarree(),
-                    zorder=1)
-
-        # Invisible contours, only for labels.
-        # Change zorder for cartopy/matplotlib label issue, as of June 2019
-        inv_map = plt.contour(lonw,
-                              lat,
-                              slopew,
-                              levels=regr_levs,
-                              colors='k',
-                              transform=ccrs.PlateCarree(),
-                              zorder=15)
+        regr_map = plt.contour(lonw,
+                               lat,
+                               slopew,
+                               levels=regr_levs,
+                               colors='k',
+                               transform=ccrs.PlateCarree(),
+                               zorder=1)
 
         mpl.rcParams['contour.negative_linestyle'] = 'dashed'
 
-        for cmap in inv_map.collections:
-            cmap.set_visible(False)
-
         # Add contour labels over white boxes
         kwargs = {'fontsize': 8, 'fmt': '%1.0f'}
         if mpl.__version__.split('.') >= ['3', '3']:
             kwargs['zorder'] = 30  # new in matplotlib version 3.3
-        plt.clabel(inv_map, **kwargs)
+        clabs = plt.clabel(regr_map, **kwargs)
         # work around https://github.com/SciTools/cartopy/issues/1554
         # in cartopy 0.18
-        clabs = inv_map.labelTextsList
         bbox_dict = dict(boxstyle='square,pad=0',
                          edgecolor='none',
                          fc='white',
@@ -248,20 +225,16 @@ def zmnam_plot(file_gh_mo, datafolder, figfolder, src_props, fig_fmt,
                  fontsize=12,
                  transform=plt.gcf().transFigure)
 
-        fname = (figfolder + '_'.join(src_props) + '_' +
-                 str(int(lev[i_lev])) + 'Pa_mo_reg_' + index_name +
-                 '.' + fig_fmt)
+        fname = (f'{fig_prefix}_{int(lev[i_lev])}Pa_mo_reg_{index_name}'
+                 f'.{fig_fmt}')
         plt.savefig(fname, format=fig_fmt)
         plot_files.append(fname)
 
-        plt.close('all')
-
-        # Save regression results in array
-        regr_arr[i_lev, :, :] = slope
+    plt.close('all')
 
     # Save 3D regression results in output netCDF
-    with netCDF4.Dataset(datafolder + '_'.join(src_props) + '_regr_map_' +
-                         index_name + '.nc', mode='w') as file_out:
+    with netCDF4.Dataset(f'{data_prefix}_regr_map_{index_name}.nc',
+                         mode='w') as file_out:
         file_out.title = 'Zonal mean annular mode (4)'
         file_out.contact = 'F. Serva (federico.serva@artov.ismar.cnr.it); \
         C. Cagnazzo (chiara.cagnazzo@cnr.it)'
@@ -1,5 +1,6 @@
 """Tests for the module :mod:`esmvaltool.cmorizers.data.utilities`."""
 
+import gzip
 from unittest.mock import Mock
 
 import dask.array as da
@@ -329,3 +330,49 @@ def test_read_cmor_config():
     assert 'thetao' in cfg['variables']
     assert 'Omon' in cfg['cmor_table'].tables
     assert 'thetao' in cfg['cmor_table'].tables['Omon']
+
+
+@pytest.mark.parametrize('limit', [0, utils.GUNZIP_IN_MEMORY_LIMIT])
+def test_gunzip(tmp_path, monkeypatch, limit):
+    """Test gunzip both in memory and streaming to disk."""
+    monkeypatch.setattr(utils, 'GUNZIP_IN_MEMORY_LIMIT', limit)
+    content = b'sample data' * 1000
+    zip_path = tmp_path / 'sample.nc.gz'
+    with gzip.open(zip_path, 'wb') as zip_file:
+        zip_file.write(content)
+    work_dir = tmp_path / 'work'
+    work_dir.mkdir()
+    utils._gunzip(str(zip_path), str(work_dir))
+    assert (work_dir / 'sample.nc').read_bytes() == content
+
+
+@pytest.mark.parametrize('member_sizes,fits', [
+    ([1000], True),
+    ([1001], False),
+    ([500, 500], True),
+    ([600, 600], False),
+])
+def test_gunzip_fits_in_memory(tmp_path, monkeypatch, member_sizes, fits):
+    """Test that the total uncompressed size is compared to the limit."""
+    monkeypatch.setattr(utils, 'GUNZIP_IN_MEMORY_LIMIT', 1000)
+    zip_path = tmp_path / 'sample.nc.gz'
+    content = b''
+    for (i, member_size) in enumerate(member_sizes):
+        member = bytes([i]) * member_size
+        with gzip.open(zip_path, 'ab') as zip_file:
+            zip_file.write(member)
+        content += member
+    data = utils._gunzip_in_memory(str(zip_path))
+    if fits:
+        assert data == content
+    else:
+        assert data is None
+
+
+def test_gunzip_fits_in_memory_large_archive(tmp_path, monkeypatch):
+    """Test that archives larger than the limit are not read into memory."""
+    monkeypatch.setattr(utils, 'GUNZIP_IN_MEMORY_LIMIT', 10)
+    zip_path = tmp_path / 'sample.nc.gz'
+    with gzip.open(zip_path, 'wb') as zip_file:
+        zip_file.write(b'sample data')
+    assert utils._gunzip_in_memory(str(zip_path)) is None
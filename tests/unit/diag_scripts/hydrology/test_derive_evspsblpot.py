@@ -0,0 +1,112 @@
+"""Tests for the De Bruin (2016) evspsblpot derivation in hydrology."""
+import dask.array as da
+import iris.coords
+import iris.cube
+import numpy as np
+import pytest
+from cf_units import Unit
+
+from esmvaltool.diag_scripts.hydrology.derive_evspsblpot import (
+    debruin_pet,
+    tetens_derivative,
+)
+
+TAS = np.array([[263.15, 273.15], [288.15, 303.15]], dtype=np.float32)
+PSL = np.array([[101325., 100000.], [102000., 99000.]], dtype=np.float32)
+RSDS = np.array([[50., 150.], [250., 350.]], dtype=np.float32)
+RSDT = np.array([[200., 300.], [400., 500.]], dtype=np.float32)
+MASK = np.array([[False, True], [False, False]])
+
+
+def _to_array(data, kind):
+    """Convert test data to a numpy, masked or dask array."""
+    if kind == 'masked':
+        return np.ma.masked_array(data, mask=MASK)
+    if kind == 'lazy':
+        return da.from_array(data)
+    return data.copy()
+
+
+def _assert_data_close(cube, expected, kind):
+    """Compare the (unmasked) data of a cube to the expected values."""
+    data = cube.data
+    if kind == 'masked':
+        np.testing.assert_array_equal(np.ma.getmaskarray(data), MASK)
+        data = data[~MASK]
+        expected = expected[~MASK]
+    np.testing.assert_allclose(data, expected, rtol=1e-5)
+
+
+def _create_cube(data, var_name, units, kind='numpy', lats=(10., 20.)):
+    """Create a cube on a 2x2 latitude/longitude grid."""
+    lat = iris.coords.DimCoord(list(lats),
+                               standard_name='latitude',
+                               units='degrees')
+    lon = iris.coords.DimCoord([0., 10.],
+                               standard_name='longitude',
+                               units='degrees')
+    return iris.cube.Cube(_to_array(data, kind),
+                          var_name=var_name,
+                          units=units,
+                          dim_coords_and_dims=[(lat, 0), (lon, 1)])
+
+
+def _create_input_cubes(kind='numpy'):
+    """Create the input cubes for debruin_pet."""
+    return {
+        var_name: _create_cube(data, var_name, units, kind)
+        for (var_name, data, units) in [
+            ('tas', TAS, 'K'),
+            ('psl', PSL, 'Pa'),
+            ('rsds', RSDS, 'W m-2'),
+            ('rsdt', RSDT, 'W m-2'),
+        ]
+    }
+
+
+def _expected_tetens_derivative(tas):
+    """Closed-form derivative of Teten's formula in hPa degC-1."""
+    temp = tas - 273.15
+    return (17.67 * 243.5 * 6.112 * np.exp(17.67 * temp / (temp + 243.5)) /
+            (temp + 243.5)**2)
+
+
+@pytest.mark.parametrize('kind', ['numpy', 'masked', 'lazy'])
+def test_tetens_derivative(kind):
+    """Test the derivative of Teten's formula for different array types."""
+    tas = _create_cube(TAS, 'tas', 'K', kind)
+    delta_svp = tetens_derivative(tas)
+    assert delta_svp.has_lazy_data() == (kind == 'lazy')
+    assert delta_svp.units == Unit('hPa') / Unit('degC')
+    _assert_data_close(delta_svp, _expected_tetens_derivative(TAS), kind)
+
+
+@pytest.mark.parametrize('kind', ['numpy', 'masked', 'lazy'])
+def test_debruin_pet(kind):
+    """Test the De Bruin reference evaporation for different array types."""
+    cubes = _create_input_cubes(kind)
+    cubes['tas'].add_cell_method(iris.coords.CellMethod('mean', 'time'))
+    cubes['tas'].attributes['comment'] = 'tas'
+    pet = debruin_pet(**cubes)
+
+    delta_svp = _expected_tetens_derivative(TAS)
+    gamma = 461.51 / 287.0 * 1004. * (PSL / 100.) / 2.5e6
+    net_radiation = (1 - 0.23) * RSDS - 110. * RSDS / RSDT
+    expected = ((delta_svp / (delta_svp + gamma)) * net_radiation +
+                20.) / 2.5e6
+
+    assert pet.has_lazy_data() == (kind == 'lazy')
+    assert pet.var_name == 'evspsblpot'
+    assert pet.standard_name == 'water_potential_evaporation_flux'
+    assert pet.cell_methods == ()
+    assert pet.attributes == {}
+    pet.convert_units('kg m-2 s-1')
+    _assert_data_close(pet, expected, kind)
+
+
+def test_debruin_pet_different_grid():
+    """Test that inputs on different grids are rejected."""
+    cubes = _create_input_cubes()
+    cubes['rsds'] = _create_cube(RSDS, 'rsds', 'W m-2', lats=(20., 10.))
+    with pytest.raises(ValueError, match="Coordinate 'latitude'"):
+        debruin_pet(**cubes)